@@ -6,14 +6,138 @@ Melhorias de legibilidade:
 - Helpers para montar informações do servidor e respostas JSON
 - Remoção de imports não utilizados
 - Padronização de host/porta de execução
+- Medição passiva de RTT via TCP_INFO do socket da requisição (Linux)
+- Deduplicação por conteúdo dos blocos pesados enviados pelos clientes
+- Stream SSE de telemetria ao vivo com um produtor compartilhado
 """
 
-from flask import Flask, render_template, jsonify, request
-import uuid
+from flask import Flask, Response, render_template, jsonify, request
+from fingerprint_store import FingerprintStore
+from telemetry_stream import get_broadcaster
+from collections import OrderedDict
 from datetime import datetime
+from typing import Optional
+import socket
+import struct
+import threading
+import uuid
 
 app = Flask(__name__)
 
+# Layout de ``struct tcp_info`` (linux/tcp.h) até ``tcpi_total_retrans``:
+# 8 campos de 1 byte seguidos de 24 inteiros de 32 bits.
+_TCP_INFO_FORMAT = "8B24I"
+_TCP_INFO_SIZE = struct.calcsize(_TCP_INFO_FORMAT)
+
+# Número máximo de clientes mantidos no agregado de RTT (LRU)
+TCP_STATS_MAX_CLIENTS = 1024
+
+
+class _TcpStatsLRU:
+    """Agregados de TCP_INFO por cliente com descarte LRU e acesso thread-safe."""
+
+    def __init__(self, max_clients: int = TCP_STATS_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, client: str, sample: dict) -> dict:
+        """Adiciona uma amostra ao agregado do cliente e retorna o agregado."""
+        rtt_ms = sample["rtt_ms"]
+        with self._lock:
+            stats = self._clients.pop(client, None)
+            if stats is None:
+                stats = {
+                    "samples": 0,
+                    "rtt_min_ms": rtt_ms,
+                    "rtt_max_ms": rtt_ms,
+                    "rtt_avg_ms": 0.0,
+                }
+            stats["samples"] += 1
+            stats["rtt_min_ms"] = min(stats["rtt_min_ms"], rtt_ms)
+            stats["rtt_max_ms"] = max(stats["rtt_max_ms"], rtt_ms)
+            # Média incremental, sem guardar o histórico de amostras
+            stats["rtt_avg_ms"] += (rtt_ms - stats["rtt_avg_ms"]) / stats["samples"]
+            stats["last"] = sample
+            stats["last_seen"] = datetime.now().isoformat()
+            self._clients[client] = stats
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+            return dict(stats)
+
+    def get(self, client: str) -> Optional[dict]:
+        """Retorna uma cópia do agregado do cliente, se existir."""
+        with self._lock:
+            stats = self._clients.get(client)
+            if stats is None:
+                return None
+            self._clients.move_to_end(client)
+            return dict(stats)
+
+
+_tcp_stats = _TcpStatsLRU()
+
+# Submissões recentes de /api/client-info, com blocos pesados deduplicados
+_fingerprints = FingerprintStore()
+
+
+def _request_socket() -> Optional[socket.socket]:
+    """Obtém o socket TCP da requisição atual, quando o servidor WSGI o expõe."""
+    for key in ("werkzeug.socket", "gunicorn.socket"):
+        sock = request.environ.get(key)
+        if sock is not None:
+            return sock
+    return None
+
+
+def _read_tcp_info(sock: socket.socket) -> Optional[dict]:
+    """Lê TCP_INFO do socket e converte os campos relevantes (tempos em ms)."""
+    if not hasattr(socket, "TCP_INFO"):
+        return None
+    try:
+        raw = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, _TCP_INFO_SIZE)
+    except (OSError, ValueError):
+        return None
+    if len(raw) < _TCP_INFO_SIZE:
+        return None
+
+    fields = struct.unpack(_TCP_INFO_FORMAT, raw)
+    u8, u32 = fields[:8], fields[8:]
+    return {
+        "rtt_ms": u32[15] / 1000.0,
+        "rttvar_ms": u32[16] / 1000.0,
+        "rto_ms": u32[0] / 1000.0,
+        "retransmits": u8[2],
+        "total_retrans": u32[23],
+        "lost": u32[6],
+        "snd_cwnd": u32[18],
+        "snd_mss": u32[2],
+        "pmtu": u32[13],
+    }
+
+
+def _collect_tcp_info() -> Optional[dict]:
+    """Mede o socket da requisição atual e atualiza o agregado do cliente.
+
+    Atrás de um proxy reverso o socket pertence ao proxy: a amostra mede o
+    RTT até ele e não é agregada, para não misturar todos os visitantes em
+    uma única entrada.
+    """
+    sock = _request_socket()
+    if sock is None:
+        return None
+    sample = _read_tcp_info(sock)
+    if sample is None:
+        return None
+
+    if request.headers.get("X-Forwarded-For"):
+        return {"current": sample, "client": None, "via_proxy": True}
+    return {
+        "current": sample,
+        "client": _tcp_stats.record(request.remote_addr or "unknown", sample),
+        "via_proxy": False,
+    }
+
 
 def _build_server_info() -> dict:
     """Monta informações do lado do servidor a partir do request atual."""
@@ -31,6 +155,7 @@ def _build_server_info() -> dict:
         "x_forwarded_proto": request.headers.get("X-Forwarded-Proto", ""),
         "x_forwarded_host": request.headers.get("X-Forwarded-Host", ""),
         "x_forwarded_port": request.headers.get("X-Forwarded-Port", ""),
+        "tcp_info": _collect_tcp_info(),
     }
 
 
@@ -53,22 +178,62 @@ def ping():
     """Endpoint simples para testar latência de rede"""
     return '', 200
 
+@app.route('/api/tcp-info', methods=['GET'])
+def tcp_info():
+    """Endpoint com RTT/retransmissões medidos passivamente pelo kernel (TCP_INFO)"""
+    measurement = _collect_tcp_info()
+    if measurement is None:
+        return _json_error("TCP_INFO indisponível neste servidor/plataforma", 501)
+
+    return _json_success(measurement)
+
 @app.route('/api/client-info', methods=['POST'])
 def client_info():
     """Endpoint para receber informações do cliente"""
     try:
         client_data = request.get_json() or {}
+        session_id = str(uuid.uuid4())
 
         combined_info = {
             "client_data": client_data,
             "server_info": _build_server_info(),
-            "session_id": str(uuid.uuid4()),
+            "session_id": session_id,
+            "fingerprint_refs": _fingerprints.add(session_id, client_data),
         }
 
         return _json_success(combined_info)
     except Exception as e:
         return _json_error(str(e))
 
+@app.route('/api/client-info/<session_id>', methods=['GET'])
+def stored_client_info(session_id):
+    """Endpoint para recuperar uma submissão recente (blocos reconstruídos)"""
+    client_data = _fingerprints.get(session_id)
+    if client_data is None:
+        return _json_error("Sessão não encontrada", 404)
+    return _json_success({"client_data": client_data, "session_id": session_id})
+
+@app.route('/api/fingerprint-stats', methods=['GET'])
+def fingerprint_stats():
+    """Endpoint com estatísticas do armazenamento deduplicado"""
+    return _json_success(_fingerprints.stats())
+
+@app.route('/api/telemetry/stream', methods=['GET'])
+def telemetry_stream():
+    """Endpoint SSE com métricas do servidor e probes de conectividade ao vivo"""
+    if request.method == 'HEAD':
+        # HEAD não consome o stream; não registra assinante nem inicia o produtor
+        return Response(mimetype='text/event-stream', headers={"Cache-Control": "no-cache"})
+    return Response(
+        get_broadcaster().subscribe(),
+        mimetype='text/event-stream',
+        headers={
+            "Cache-Control": "no-cache",
+            # Evita que proxies reversos (nginx) acumulem os eventos em buffer
+            "X-Accel-Buffering": "no",
+        },
+    )
+
 @app.route('/api/export-report', methods=['POST'])
 def export_report():
     """Endpoint para exportar relatório do cliente"""
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Armazenamento deduplicado (endereçado por conteúdo) das submissões de clientes.
+
+Os navegadores enviam repetidamente blocos pesados e quase sempre idênticos
+(plugins, MIME types, capacidades WebGL, lista de recursos suportados...).
+Cada bloco é canonicalizado (JSON com chaves ordenadas), identificado pelo
+seu SHA-256 e armazenado uma única vez; as submissões guardam apenas
+referências.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import copy
+import hashlib
+import json
+import threading
+
+# Sub-documentos de client_data deduplicados (caminhos em getClientInfo()),
+# com as chaves que variam por visitante e por isso ficam fora do bloco
+DEDUP_BLOCKS: Tuple[Tuple[Tuple[str, ...], Tuple[str, ...]], ...] = (
+    (("browser", "plugins"), ()),
+    (("browser", "mimeTypes"), ()),
+    (("browser", "languages"), ()),
+    (("browser", "userAgentData"), ()),
+    (("hardware", "gpu"), ()),
+    (("hardware", "inputTypes"), ()),
+    (("hardware", "sensors"), ()),
+    (("additional",), ("cookies", "cookieCount", "localStorage", "sessionStorage")),
+)
+
+# Blocos menores que isso custam menos inline do que como referência
+MIN_BLOCK_BYTES = 256
+
+# Limites padrão de memória
+MAX_SUBMISSIONS = 10000
+MAX_SUBMISSION_BYTES = 256 * 1024
+MAX_STORE_BYTES = 64 * 1024 * 1024
+DECODED_CACHE_SIZE = 256
+
+REF_KEY = "$ref"
+
+
+def canonicalize(block) -> bytes:
+    """Serializa um bloco de forma canônica (independente da ordem das chaves)."""
+    return json.dumps(block, sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False).encode("utf-8")
+
+
+def block_digest(canonical: bytes) -> str:
+    """Endereço do bloco: SHA-256 do conteúdo canônico."""
+    return hashlib.sha256(canonical).hexdigest()
+
+
+class FingerprintStore:
+    """Submissões recentes com blocos pesados armazenados uma única vez.
+
+    - ``_blocks``: digest -> [bytes canônicos, contagem de referências, digest]
+    - ``_decoded``: LRU de blocos já decodificados, na frente de ``_blocks``
+    - ``_submissions``: session_id -> (JSON compacto, pares (caminho, digest))
+
+    Somente os caminhos registrados nos pares são reconstruídos; um ``$ref``
+    enviado pelo próprio cliente é tratado como dado comum.
+
+    O armazenamento é limitado em número de submissões e em bytes (submissões
+    compactas + blocos); as mais antigas são descartadas primeiro, liberando
+    as referências dos seus blocos. Submissões acima de ``max_submission_bytes``
+    (JSON compacto + blocos) não são armazenadas.
+    """
+
+    def __init__(self, max_submissions: int = MAX_SUBMISSIONS,
+                 max_submission_bytes: int = MAX_SUBMISSION_BYTES,
+                 max_bytes: int = MAX_STORE_BYTES,
+                 decoded_cache_size: int = DECODED_CACHE_SIZE):
+        self.max_submissions = max_submissions
+        self.max_submission_bytes = max_submission_bytes
+        self.max_bytes = max_bytes
+        self.decoded_cache_size = decoded_cache_size
+        self._blocks = {}
+        self._decoded = OrderedDict()
+        self._submissions = OrderedDict()
+        self._submission_bytes = 0
+        self._block_bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, client_data) -> Optional[Dict[str, str]]:
+        """Armazena a submissão e retorna as referências ``caminho -> digest``.
+
+        Retorna None quando a submissão (incluindo seus blocos) excede o limite
+        de tamanho e não foi armazenada. Payloads que não são objetos JSON são
+        guardados sem deduplicação.
+        """
+        compact = client_data
+        blocks = []
+        if isinstance(client_data, dict):
+            for path, volatile_keys in DEDUP_BLOCKS:
+                block = _get_path(compact, path)
+                if block is None:
+                    continue
+                inline = {}
+                if volatile_keys and isinstance(block, dict):
+                    inline = {key: block[key] for key in volatile_keys if key in block}
+                    block = {key: value for key, value in block.items() if key not in inline}
+                canonical = canonicalize(block)
+                if len(canonical) < MIN_BLOCK_BYTES:
+                    continue
+                digest = block_digest(canonical)
+                blocks.append((path, digest, canonical))
+                compact = _set_path(compact, path, dict(inline, **{REF_KEY: digest}))
+
+        data = canonicalize(compact)
+        if len(data) + sum(len(canonical) for _, _, canonical in blocks) > self.max_submission_bytes:
+            return None
+
+        with self._lock:
+            refs = []
+            for path, digest, canonical in blocks:
+                entry = self._blocks.get(digest)
+                if entry is None:
+                    self._blocks[digest] = [canonical, 1, digest]
+                    self._block_bytes += len(canonical)
+                else:
+                    entry[1] += 1
+                    # Reutiliza o digest já armazenado: as submissões compartilham o objeto str
+                    digest = entry[2]
+                refs.append((path, digest))
+
+            previous = self._submissions.pop(session_id, None)
+            if previous is not None:
+                self._submission_bytes -= len(previous[0])
+                self._release(previous[1])
+            self._submissions[session_id] = (data, tuple(refs))
+            self._submission_bytes += len(data)
+
+            while self._submissions and (
+                    len(self._submissions) > self.max_submissions
+                    or self._submission_bytes + self._block_bytes > self.max_bytes):
+                _, (evicted_data, evicted_refs) = self._submissions.popitem(last=False)
+                self._submission_bytes -= len(evicted_data)
+                self._release(evicted_refs)
+            return {".".join(path): digest for path, digest in refs}
+
+    def get(self, session_id: str):
+        """Reconstrói a submissão completa a partir das referências."""
+        with self._lock:
+            stored = self._submissions.get(session_id)
+            if stored is None:
+                return None
+            self._submissions.move_to_end(session_id)
+            data, refs = stored
+            document = json.loads(data)
+            for path, digest in refs:
+                node = _get_path(document, path)
+                inline = {key: value for key, value in node.items() if key != REF_KEY}
+                block = self._decode(digest)
+                if inline:
+                    block.update(inline)
+                document = _set_path(document, path, block)
+            return document
+
+    def stats(self) -> dict:
+        """Resumo de ocupação do armazenamento."""
+        with self._lock:
+            return {
+                "submissions": len(self._submissions),
+                "unique_blocks": len(self._blocks),
+                "block_references": sum(entry[1] for entry in self._blocks.values()),
+                "submission_bytes": self._submission_bytes,
+                "block_bytes": self._block_bytes,
+                "decoded_cache": len(self._decoded),
+            }
+
+    def _decode(self, digest: str):
+        """Retorna uma cópia do bloco decodificado, passando pelo LRU (com lock)."""
+        block = self._decoded.get(digest)
+        if block is None:
+            block = json.loads(self._blocks[digest][0])
+            self._decoded[digest] = block
+            while len(self._decoded) > self.decoded_cache_size:
+                self._decoded.popitem(last=False)
+        else:
+            self._decoded.move_to_end(digest)
+        # Cópia para que o chamador não altere o bloco compartilhado
+        return copy.deepcopy(block)
+
+    def _release(self, refs: Tuple[Tuple[Tuple[str, ...], str], ...]):
+        """Libera referências de blocos, removendo os que ficarem sem uso (com lock)."""
+        for _, digest in refs:
+            entry = self._blocks.get(digest)
+            if entry is None:
+                continue
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._blocks[digest]
+                self._block_bytes -= len(entry[0])
+                self._decoded.pop(digest, None)
+
+
+def _get_path(document: dict, path: Tuple[str, ...]):
+    """Obtém o valor em ``path`` ou None se algum nível não existir."""
+    node = document
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
+
+
+def _set_path(document: dict, path: Tuple[str, ...], value) -> dict:
+    """Retorna uma cópia rasa de ``document`` com ``path`` substituído por ``value``.
+
+    Apenas os dicionários ao longo do caminho são copiados, então o documento
+    original recebido do cliente não é alterado.
+    """
+    updated = dict(document)
+    node = updated
+    for key in path[:-1]:
+        node[key] = dict(node[key])
+        node = node[key]
+    node[path[-1]] = value
+    return updated
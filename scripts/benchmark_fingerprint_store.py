@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Benchmark da deduplicação de fingerprints com tráfego sintético
+Gera submissões com a mesma estrutura de getClientInfo() (static/js/app.js)
+e compara a memória de guardar o JSON bruto de cada submissão com o FingerprintStore
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Dict, List
+
+# Permite importar os módulos da raiz do projeto ao executar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerprint_store import FingerprintStore  # noqa: E402
+
+# Recursos verificados em getClientInfo().additional (todos no formato {available: bool})
+FEATURES = [
+    "pushNotifications", "clipboard", "battery", "vibration", "fullscreen", "webAudio",
+    "webShare", "paymentRequest", "webBluetooth", "webUSB", "webWorkers", "sharedArrayBuffer",
+    "bigInt", "symbol", "proxy", "map", "set", "promise", "generator", "asyncAwait",
+    "classes", "modules", "webAssembly", "serviceWorker"
+]
+
+PDF_PLUGINS = ["PDF Viewer", "Chrome PDF Viewer", "Chromium PDF Viewer",
+               "Microsoft Edge PDF Viewer", "WebKit built-in PDF"]
+
+WEBGL_EXTENSIONS = [
+    "ANGLE_instanced_arrays", "EXT_blend_minmax", "EXT_clip_control", "EXT_color_buffer_half_float",
+    "EXT_depth_clamp", "EXT_disjoint_timer_query", "EXT_float_blend", "EXT_frag_depth",
+    "EXT_polygon_offset_clamp", "EXT_shader_texture_lod", "EXT_texture_compression_bptc",
+    "EXT_texture_compression_rgtc", "EXT_texture_filter_anisotropic", "EXT_texture_mirror_clamp_to_edge",
+    "EXT_sRGB", "KHR_parallel_shader_compile", "OES_element_index_uint", "OES_fbo_render_mipmap",
+    "OES_standard_derivatives", "OES_texture_float", "OES_texture_float_linear", "OES_texture_half_float",
+    "OES_texture_half_float_linear", "OES_vertex_array_object", "WEBGL_color_buffer_float",
+    "WEBGL_compressed_texture_s3tc", "WEBGL_compressed_texture_s3tc_srgb", "WEBGL_debug_renderer_info",
+    "WEBGL_debug_shaders", "WEBGL_depth_texture", "WEBGL_draw_buffers", "WEBGL_lose_context",
+    "WEBGL_multi_draw", "WEBGL_polygon_mode"
+]
+
+GPUS = [
+    ("Google Inc. (Intel)", "ANGLE (Intel, Mesa Intel(R) UHD Graphics 620 (KBL GT2), OpenGL 4.6)"),
+    ("Google Inc. (NVIDIA)", "ANGLE (NVIDIA, NVIDIA GeForce RTX 3060 Direct3D11 vs_5_0 ps_5_0, D3D11)"),
+    ("Google Inc. (AMD)", "ANGLE (AMD, AMD Radeon RX 6600 Direct3D11 vs_5_0 ps_5_0, D3D11)"),
+    ("Apple Inc.", "Apple GPU"),
+    ("Qualcomm", "Adreno (TM) 650"),
+]
+
+
+def build_profiles(count: int) -> List[Dict]:
+    """Gera perfis de navegador/dispositivo (partes estáveis entre visitas)"""
+    profiles = []
+    for index in range(count):
+        rng = random.Random(index)
+        family = rng.choice(["chrome", "firefox", "safari", "edge"])
+        mobile = rng.random() < 0.3
+        vendor, renderer = rng.choice(GPUS)
+        extensions = sorted(rng.sample(WEBGL_EXTENSIONS, rng.randint(24, len(WEBGL_EXTENSIONS))))
+        chromium = family in ("chrome", "edge")
+        profiles.append({
+            "userAgent": f"Mozilla/5.0 ({'Linux; Android 14' if mobile else 'X11; Linux x86_64'}) "
+                         f"{family.title()}/{rng.randint(110, 130)}.0",
+            "platform": "Linux armv8l" if mobile else "Linux x86_64",
+            "vendor": "Google Inc." if chromium else ("Apple Computer, Inc." if family == "safari" else ""),
+            "languages": rng.choice([["pt-BR", "pt", "en-US", "en"], ["en-US", "en"], ["pt-BR"]]),
+            "userAgentData": {
+                "brands": [{"brand": "Chromium", "version": "124"},
+                           {"brand": "Google Chrome", "version": "124"},
+                           {"brand": "Not-A.Brand", "version": "99"}],
+                "mobile": mobile,
+                "platform": "Android" if mobile else "Linux"
+            } if chromium else "N/A",
+            "plugins": [] if mobile else [{
+                "name": name,
+                "filename": "internal-pdf-viewer",
+                "description": "Portable Document Format"
+            } for name in PDF_PLUGINS],
+            "mimeTypes": [] if mobile else [{
+                "type": mime,
+                "description": "Portable Document Format",
+                "suffixes": "pdf"
+            } for mime in ("application/pdf", "text/pdf")],
+            "gpu": {
+                "vendor": vendor,
+                "renderer": renderer,
+                "version": "WebGL 1.0 (OpenGL ES 2.0 Chromium)" if chromium else "WebGL 1.0",
+                "webglSupport": {"webgl": True, "webgl2": family != "safari" or rng.random() < 0.5},
+                "webglExtensions": {
+                    "count": len(extensions),
+                    "list": extensions,
+                    "debugInfo": "Disponível"
+                }
+            },
+            "inputTypes": ["Touch"] if mobile else ["Mouse", "Keyboard", "Wheel"],
+            "sensors": ["Accelerometer", "Gyroscope", "Magnetometer"] if mobile and chromium else [],
+            "features": {name: {"available": rng.random() < 0.9} for name in FEATURES},
+            "cores": rng.choice([4, 8, 12, 16]),
+            "memory": rng.choice([4, 8]),
+            "screen": rng.choice([(1920, 1080), (2560, 1440), (390, 844), (412, 915)])
+        })
+    return profiles
+
+
+def build_submission(profile: Dict, rng: random.Random) -> Dict:
+    """Monta uma submissão no formato de getClientInfo() com campos variáveis por visita"""
+    now = time.time() * 1000 + rng.random() * 1e6
+    nav_start = int(now)
+    width, height = profile["screen"]
+    additional = {
+        "cookies": f"session={uuid.UUID(int=rng.getrandbits(128))}",
+        "cookieCount": 1,
+        "localStorage": {"available": True, "items": rng.randint(0, 3), "keys": ["theme"][:rng.randint(0, 1)]},
+        "sessionStorage": {"available": True, "items": 0, "keys": []},
+        "webRTC": {"available": True, "getUserMedia": True},
+        "webGL": {"available": True, "version": profile["gpu"]["version"]},
+        "notifications": {"available": True, "permission": "default"},
+        "webSpeech": {"speechSynthesis": True, "speechRecognition": profile["userAgentData"] != "N/A"},
+    }
+    additional.update(profile["features"])
+    return {
+        "browser": {
+            "userAgent": profile["userAgent"],
+            "language": profile["languages"][0],
+            "languages": profile["languages"],
+            "platform": profile["platform"],
+            "cookieEnabled": True,
+            "onLine": True,
+            "doNotTrack": None,
+            "vendor": profile["vendor"],
+            "vendorSub": "",
+            "productSub": "20030107",
+            "appName": "Netscape",
+            "appVersion": profile["userAgent"][8:],
+            "appCodeName": "Mozilla",
+            "buildID": "N/A",
+            "oscpu": "N/A",
+            "product": "Gecko",
+            "userAgentData": profile["userAgentData"],
+            "webdriver": False,
+            "plugins": profile["plugins"],
+            "mimeTypes": profile["mimeTypes"]
+        },
+        "screen": {
+            "width": width, "height": height, "availWidth": width, "availHeight": height - 40,
+            "colorDepth": 24, "pixelDepth": 24, "orientation": "landscape-primary",
+            "availLeft": 0, "availTop": 0, "left": 0, "top": 0,
+            "orientationDetails": {"angle": 0, "type": "landscape-primary", "onchange": "object"},
+            "isExtended": False, "brightness": "N/A"
+        },
+        "window": {
+            "innerWidth": rng.randint(360, width), "innerHeight": rng.randint(500, height),
+            "outerWidth": width, "outerHeight": height, "devicePixelRatio": 1,
+            "screenX": 0, "screenY": 0, "screenLeft": 0, "screenTop": 0,
+            "scrollX": 0, "scrollY": rng.randint(0, 500), "pageXOffset": 0, "pageYOffset": 0,
+            "visualViewport": {"width": width, "height": height, "offsetLeft": 0, "offsetTop": 0, "scale": 1},
+            "documentHasFocus": True, "visibilityState": "visible", "hidden": False
+        },
+        "location": {
+            "href": "http://localhost:5000/", "protocol": "http:", "host": "localhost:5000",
+            "hostname": "localhost", "port": "5000", "pathname": "/", "search": "", "hash": "",
+            "origin": "http://localhost:5000", "ancestorOrigins": [], "referrer": "",
+            "domain": "localhost", "baseURI": "http://localhost:5000/",
+            "title": "Coletor de Informações do Cliente", "characterSet": "UTF-8",
+            "charset": "UTF-8", "defaultCharset": None
+        },
+        "timezone": {
+            "timezone": "America/Sao_Paulo", "offset": 180, "locale": profile["languages"][0],
+            "offsetHours": -3, "offsetString": "Horário Padrão de Brasília",
+            "currentTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z"), "localTime": str(nav_start),
+            "localDate": "19/10/2026", "localTimeString": str(nav_start % 86400),
+            "calendar": "gregory", "numberingSystem": "latn",
+            "dateFormat": "19/10/2026", "timeFormat": str(nav_start % 86400),
+            "timezoneOffset": 180, "timezoneName": "Horário Padrão de Brasília"
+        },
+        "hardware": {
+            "cores": profile["cores"],
+            "memory": profile["memory"],
+            "maxTouchPoints": 5 if "Touch" in profile["inputTypes"] else 0,
+            "gpu": profile["gpu"],
+            "deviceType": "Mobile" if "Touch" in profile["inputTypes"] else "Desktop",
+            "inputTypes": profile["inputTypes"],
+            "sensors": profile["sensors"]
+        },
+        "performance": {
+            "connection": {"legacy": None, "online": True, "connectionType": "unknown",
+                           "saveData": False, "webRTC": {"available": True}},
+            "timing": {name: nav_start + offset for offset, name in enumerate([
+                "navigationStart", "fetchStart", "domainLookupStart", "domainLookupEnd",
+                "connectStart", "connectEnd", "requestStart", "responseStart", "responseEnd",
+                "domLoading", "domInteractive", "domComplete", "loadEventStart", "loadEventEnd"
+            ], start=rng.randint(0, 50))},
+            "memory": "N/A",
+            "navigation": {"type": 0, "redirectCount": 0},
+            "resources": rng.randint(3, 8),
+            "paint": [{"name": "first-paint", "startTime": rng.random() * 500, "duration": 0}]
+        },
+        "geolocation": {"available": True},
+        "media": {"mediaDevices": "Disponível", "webRTC": "Disponível"},
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "localTime": str(nav_start),
+        "additional": additional
+    }
+
+
+def measure(build) -> int:
+    """Memória alocada (bytes) que permanece após executar ``build``"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark da deduplicação de fingerprints")
+    parser.add_argument("--submissions", "-n", type=int, default=20000, help="Número de submissões")
+    parser.add_argument("--profiles", "-p", type=int, default=200, help="Perfis de navegador distintos")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    profiles = build_profiles(args.profiles)
+    # Corpos JSON como chegam ao servidor; cada submissão é decodificada de novo
+    bodies = [json.dumps(build_submission(rng.choice(profiles), rng)) for _ in range(args.submissions)]
+    raw_bytes = sum(len(body) for body in bodies)
+
+    def keep_full():
+        # Linha de base: o JSON recebido, em bytes, guardado por submissão
+        return [body.encode("utf-8") for body in bodies]
+
+    def keep_deduplicated():
+        store = FingerprintStore(max_submissions=args.submissions, max_bytes=1 << 40)
+        for body in bodies:
+            store.add(str(uuid.uuid4()), json.loads(body))
+        return store
+
+    full_memory = measure(keep_full)
+
+    start_time = time.perf_counter()
+    store = keep_deduplicated()
+    elapsed = time.perf_counter() - start_time
+    stats = store.stats()
+    del store
+    store_memory = measure(keep_deduplicated)
+
+    stored_bytes = stats["submission_bytes"] + stats["block_bytes"]
+
+    print("=== Benchmark de Deduplicação de Fingerprints ===")
+    print(f"Submissões: {args.submissions} ({args.profiles} perfis distintos)")
+    print(f"Ingestão: {elapsed:.2f}s ({args.submissions / elapsed:,.0f} submissões/s)")
+    print(f"Blocos únicos: {stats['unique_blocks']} ({stats['block_references']} referências)")
+    print(f"JSON recebido: {raw_bytes / 1024:,.1f} KB ({raw_bytes / args.submissions:,.0f} B/submissão)")
+    print(f"JSON armazenado: {stored_bytes / 1024:,.1f} KB ({stored_bytes / args.submissions:,.0f} B/submissão)")
+    print(f"Memória (JSON bruto): {full_memory / 1024:,.1f} KB "
+          f"({full_memory / args.submissions:,.0f} B/submissão)")
+    print(f"Memória (FingerprintStore): {store_memory / 1024:,.1f} KB "
+          f"({store_memory / args.submissions:,.0f} B/submissão)")
+    print(f"Redução de memória: {100 * (1 - store_memory / full_memory):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Script para detecção e coleta de informações de dispositivos
 Pode ser executado independentemente da aplicação web
 """
 
+import heapq
 import json
 import platform
 import socket
@@ -12,17 +13,138 @@ import netifaces
 import uuid
 import subprocess
 import os
+import queue
+import re
+import select
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import argparse
 
 
+# Sistemas de arquivos virtuais/pseudo que não representam armazenamento real
+PSEUDO_FILESYSTEMS = {
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs",
+    "devpts", "devtmpfs", "efivarfs", "fusectl", "hugetlbfs", "mqueue", "nsfs",
+    "proc", "pstore", "ramfs", "rpc_pipefs", "securityfs", "selinuxfs",
+    "sysfs", "tracefs", "nfsd",
+}
+
+# Tempo máximo (s) para psutil.disk_usage responder em cada ponto de montagem
+DISK_USAGE_TIMEOUT = 2.0
+
+# Número máximo de threads consultando montagens simultaneamente
+DISK_USAGE_WORKERS = 16
+
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+# Parâmetros padrão do perfilador de processos
+TOP_PROCESSES = 10
+PROCESS_SAMPLE_INTERVAL = 0.5
+
+
+class MountInfoCache:
+    """Cache da tabela de montagens, invalidado quando /proc/self/mountinfo muda.
+
+    No Linux o kernel sinaliza alterações na tabela de montagens com POLLPRI
+    no descritor de /proc/self/mountinfo, então a tabela só é relida quando
+    algo foi montado/desmontado. Em outras plataformas usa psutil a cada chamada.
+    """
+
+    def __init__(self, path: str = MOUNTINFO_PATH):
+        self.path = path
+        self._mounts = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._poller = None
+        try:
+            self._file = open(path, 'r')
+            self._poller = select.poll()
+            self._poller.register(self._file, select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            self._file = None
+            self._poller = None
+
+    def _changed(self) -> bool:
+        """Indica se a tabela de montagens mudou desde a última leitura"""
+        return bool(self._poller.poll(0))
+
+    def get_mounts(self) -> List[Dict]:
+        """Retorna as montagens reais (sem pseudo-fs e sem duplicatas)"""
+        if self._poller is None:
+            return self._mounts_from_psutil()
+        
+        with self._lock:
+            if self._mounts is None or self._changed():
+                # Reler o arquivo pelo mesmo descritor rearma a notificação
+                self._file.seek(0)
+                self._mounts = self._parse_mountinfo(self._file.read())
+            return list(self._mounts)
+
+    @staticmethod
+    def _parse_mountinfo(content: str) -> List[Dict]:
+        """Interpreta o conteúdo de mountinfo, ignorando pseudo-fs e bind mounts repetidos"""
+        # Montagens empilhadas no mesmo caminho: só a última (visível) é mantida
+        by_mountpoint = {}
+        for line in content.splitlines():
+            # <id> <pai> <maj:min> <raiz> <montagem> <opções> [campos opcionais] - <fstype> <origem> <opções>
+            pre, sep, post = line.partition(" - ")
+            if not sep:
+                continue
+            fields = pre.split()
+            post_fields = post.split()
+            if len(fields) < 5 or len(post_fields) < 2:
+                continue
+            # Espaços e caracteres especiais vêm escapados em octal (ex.: \040)
+            mountpoint = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[4])
+            by_mountpoint.pop(mountpoint, None)
+            by_mountpoint[mountpoint] = {
+                "device": post_fields[1],
+                "mountpoint": mountpoint,
+                "fstype": post_fields[0],
+                "device_id": fields[2],
+            }
+        
+        mounts = []
+        seen_devices = set()
+        for mount in by_mountpoint.values():
+            if mount["fstype"] in PSEUDO_FILESYSTEMS:
+                continue
+            # O mesmo dispositivo montado várias vezes (bind mounts) conta uma vez
+            if mount["device_id"] in seen_devices:
+                continue
+            seen_devices.add(mount["device_id"])
+            mounts.append(mount)
+        return mounts
+
+    @staticmethod
+    def _mounts_from_psutil() -> List[Dict]:
+        """Fallback multiplataforma baseado em psutil.disk_partitions"""
+        by_mountpoint = {}
+        for partition in psutil.disk_partitions():
+            # Montagens empilhadas no mesmo caminho: só a última (visível) é mantida
+            by_mountpoint.pop(partition.mountpoint, None)
+            by_mountpoint[partition.mountpoint] = {
+                "device": partition.device,
+                "mountpoint": partition.mountpoint,
+                "fstype": partition.fstype,
+            }
+        return [mount for mount in by_mountpoint.values() if mount["fstype"] not in PSEUDO_FILESYSTEMS]
+
+
 class DeviceDetector:
     """Detector de dispositivos e coletor de informações"""
     
     def __init__(self):
         self.device_id = self._generate_device_id()
         self.timestamp = datetime.now().isoformat()
+        self.mount_cache = MountInfoCache()
+        # Montagens que excederam o timeout (ex.: NFS travado) -> thread ainda presa nelas.
+        # Não são reconsultadas enquanto essa thread não retornar ou a montagem existir
+        self._hung_mounts = {}
+        # Última amostra de processos (instante, pid -> (create_time, CPU, I/O)), base dos deltas
+        self._last_process_sample = None
     
     def _generate_device_id(self) -> str:
         """Gera um ID único para o dispositivo"""
@@ -135,6 +257,10 @@ class DeviceDetector:
     def get_hardware_info(self) -> Dict:
         """Coleta informações de hardware"""
         try:
+            # Primeira amostra de I/O; a segunda é tirada ao final da coleta
+            io_start = self._disk_io_snapshot()
+            io_start_time = time.monotonic()
+            
             # CPU
             cpu_info = {
                 "physical_cores": psutil.cpu_count(logical=False),
@@ -158,21 +284,7 @@ class DeviceDetector:
             }
             
             # Disco
-            disk_info = []
-            for partition in psutil.disk_partitions():
-                try:
-                    partition_usage = psutil.disk_usage(partition.mountpoint)
-                    disk_info.append({
-                        "device": partition.device,
-                        "mountpoint": partition.mountpoint,
-                        "fstype": partition.fstype,
-                        "total": partition_usage.total,
-                        "used": partition_usage.used,
-                        "free": partition_usage.free,
-                        "percent": (partition_usage.used / partition_usage.total) * 100
-                    })
-                except PermissionError:
-                    pass
+            disk_info = self.get_disk_info()
             
             # Informações adicionais do sistema
             system_info = {
@@ -181,15 +293,254 @@ class DeviceDetector:
                 "users": len(psutil.users())
             }
             
+            disk_io = self._disk_io_rates(io_start, self._disk_io_snapshot(),
+                                          time.monotonic() - io_start_time)
+            
             return {
                 "cpu": cpu_info,
                 "memory": memory_info,
                 "disk": disk_info,
+                "disk_io": disk_io,
                 "system": system_info
             }
         except Exception as error:
             return {"error": str(error)}
     
+    def get_disk_info(self, timeout: float = DISK_USAGE_TIMEOUT,
+                      max_workers: int = DISK_USAGE_WORKERS) -> List[Dict]:
+        """Coleta uso de disco das montagens em paralelo, com timeout por montagem"""
+        mounts = self.mount_cache.get_mounts()
+        mountpoints = {mount["mountpoint"] for mount in mounts}
+        
+        # Montagens desmontadas ou cuja chamada travada já retornou voltam a ser consultadas
+        for mountpoint, thread in list(self._hung_mounts.items()):
+            if mountpoint not in mountpoints or not thread.is_alive():
+                del self._hung_mounts[mountpoint]
+        
+        # Estado indexado pela posição da montagem, não pelo caminho
+        pending = [(index, mount) for index, mount in enumerate(mounts)
+                   if mount["mountpoint"] not in self._hung_mounts]
+        work = queue.Queue()
+        for item in pending:
+            work.put(item)
+        
+        condition = threading.Condition()
+        started = {}
+        usage = {}
+        
+        def worker():
+            while True:
+                try:
+                    index, mount = work.get_nowait()
+                except queue.Empty:
+                    return
+                with condition:
+                    started[index] = (time.monotonic(), threading.current_thread())
+                try:
+                    result = psutil.disk_usage(mount["mountpoint"])
+                except OSError as error:
+                    result = error
+                with condition:
+                    usage[index] = result
+                    condition.notify_all()
+        
+        # Pool limitado de threads daemon: uma montagem travada não impede o término do processo
+        workers = min(max_workers, len(pending))
+        for _ in range(workers):
+            threading.Thread(target=worker, daemon=True).start()
+        
+        timed_out = set()
+        with condition:
+            while len(usage) + len(timed_out) < len(pending):
+                now = time.monotonic()
+                waits = []
+                for index, (start_time, _) in started.items():
+                    if index in usage or index in timed_out:
+                        continue
+                    remaining = start_time + timeout - now
+                    if remaining <= 0:
+                        timed_out.add(index)
+                    else:
+                        waits.append(remaining)
+                # Todos os workers presos em montagens travadas: o restante não será coletado
+                if len(timed_out) >= workers:
+                    break
+                if len(usage) + len(timed_out) < len(pending):
+                    condition.wait(min(waits) if waits else timeout)
+        
+        # Esvazia a fila para que workers que retornarem tarde não iniciem novas consultas
+        while not work.empty():
+            try:
+                work.get_nowait()
+            except queue.Empty:
+                break
+        
+        disk_info = []
+        for index, mount in enumerate(mounts):
+            mountpoint = mount["mountpoint"]
+            entry = {
+                "device": mount["device"],
+                "mountpoint": mountpoint,
+                "fstype": mount["fstype"],
+            }
+            result = usage.get(index)
+            if index in timed_out:
+                self._hung_mounts[mountpoint] = started[index][1]
+                entry["error"] = f"timeout após {timeout:.1f}s"
+            elif mountpoint in self._hung_mounts:
+                entry["error"] = "montagem não responde (ignorada)"
+            elif result is None:
+                entry["error"] = "não coletado (workers ocupados por montagens travadas)"
+            elif isinstance(result, PermissionError):
+                continue
+            elif isinstance(result, Exception):
+                entry["error"] = str(result)
+            else:
+                if result.total == 0:
+                    continue  # Sistemas de arquivos sem capacidade (ex.: overlays vazios)
+                entry.update({
+                    "total": result.total,
+                    "used": result.used,
+                    "free": result.free,
+                    "percent": (result.used / result.total) * 100
+                })
+            disk_info.append(entry)
+        
+        return disk_info
+    
+    def _disk_io_snapshot(self) -> Optional[Dict]:
+        """Contadores de I/O por disco (None quando indisponíveis)"""
+        try:
+            return psutil.disk_io_counters(perdisk=True)
+        except Exception:
+            return None
+    
+    def _disk_io_rates(self, before: Optional[Dict], after: Optional[Dict], elapsed: float) -> Dict:
+        """Calcula taxas de I/O por disco entre duas amostras"""
+        if not before or not after or elapsed <= 0:
+            return {}
+        
+        rates = {}
+        for disk, end in after.items():
+            start = before.get(disk)
+            if start is None:
+                continue
+            rates[disk] = {
+                "read_bytes_per_sec": (end.read_bytes - start.read_bytes) / elapsed,
+                "write_bytes_per_sec": (end.write_bytes - start.write_bytes) / elapsed,
+                "read_ops_per_sec": (end.read_count - start.read_count) / elapsed,
+                "write_ops_per_sec": (end.write_count - start.write_count) / elapsed,
+                "read_bytes_total": end.read_bytes,
+                "write_bytes_total": end.write_bytes
+            }
+        return rates
+    
+    def _process_snapshot(self) -> Dict[int, tuple]:
+        """Amostra leve de todos os processos: pid -> (create_time, tempo de CPU, bytes de I/O)"""
+        snapshot = {}
+        # process_iter com attrs usa oneshot(): cada processo é lido em lote
+        for proc in psutil.process_iter(attrs=["create_time", "cpu_times", "io_counters"], ad_value=None):
+            info = proc.info
+            cpu_times = info["cpu_times"]
+            if cpu_times is None:
+                continue
+            io = info["io_counters"]
+            snapshot[proc.pid] = (
+                info["create_time"],
+                cpu_times.user + cpu_times.system,
+                io.read_bytes + io.write_bytes if io is not None else None
+            )
+        return snapshot
+    
+    def get_top_processes(self, top_n: int = TOP_PROCESSES,
+                          interval: float = PROCESS_SAMPLE_INTERVAL) -> Dict:
+        """Perfila processos e retorna os top-N por CPU, memória (RSS) e I/O.
+        
+        Os deltas de CPU/I/O são calculados em relação à amostra da chamada
+        anterior, então chamadas seguintes fazem uma única passagem por
+        psutil.process_iter. A primeira chamada tira uma amostra de referência;
+        a janela entre amostras é sempre de pelo menos ``interval`` segundos
+        (só há espera se a amostra anterior for mais recente que isso). Só top_n
+        entradas por métrica ficam em heaps limitados; nome, usuário e RSS são
+        obtidos somente para os processos selecionados.
+        """
+        try:
+            start_time = time.monotonic()
+            previous = self._last_process_sample
+            if previous is None and interval > 0:
+                previous = (time.monotonic(), self._process_snapshot())
+            if previous is not None:
+                # Janela mínima de ``interval``: deltas curtos demais são só ruído de clock tick
+                remaining = previous[0] + interval - time.monotonic()
+                if remaining > 0:
+                    time.sleep(remaining)
+            
+            sample_time = time.monotonic()
+            before = previous[1] if previous else {}
+            elapsed = sample_time - previous[0] if previous else 0.0
+            
+            # Heaps mínimos de tamanho top_n: (valor, pid)
+            top_cpu, top_rss, top_io = [], [], []
+            
+            def push(heap: List, value: float, pid: int):
+                if len(heap) < top_n:
+                    heapq.heappush(heap, (value, pid))
+                elif value > heap[0][0]:
+                    heapq.heapreplace(heap, (value, pid))
+            
+            current = {}
+            # process_iter com attrs usa oneshot(): cada processo é lido em lote
+            for proc in psutil.process_iter(attrs=["create_time", "cpu_times", "memory_info", "io_counters"],
+                                            ad_value=None):
+                info = proc.info
+                pid = proc.pid
+                cpu_times = info["cpu_times"]
+                io = info["io_counters"]
+                cpu_total = cpu_times.user + cpu_times.system if cpu_times is not None else None
+                io_total = io.read_bytes + io.write_bytes if io is not None else None
+                current[pid] = (info["create_time"], cpu_total, io_total)
+                
+                if info["memory_info"] is not None:
+                    push(top_rss, info["memory_info"].rss, pid)
+                
+                previous_entry = before.get(pid)
+                # Ignora processos novos ou PIDs reutilizados entre as amostras
+                if elapsed <= 0 or previous_entry is None or previous_entry[0] != info["create_time"]:
+                    continue
+                if cpu_total is not None and previous_entry[1] is not None:
+                    push(top_cpu, (cpu_total - previous_entry[1]) / elapsed * 100, pid)
+                if io_total is not None and previous_entry[2] is not None:
+                    push(top_io, (io_total - previous_entry[2]) / elapsed, pid)
+            
+            self._last_process_sample = (sample_time, current)
+            
+            def describe(heap: List, key: str) -> List[Dict]:
+                entries = []
+                for value, pid in sorted(heap, reverse=True):
+                    entry = {"pid": pid, key: value, "name": "N/A"}
+                    try:
+                        proc = psutil.Process(pid)
+                        with proc.oneshot():
+                            entry["name"] = proc.name()
+                            if key != "rss":
+                                entry["rss"] = proc.memory_info().rss
+                            entry["username"] = proc.username()
+                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                        pass
+                    entries.append(entry)
+                return entries
+            
+            return {
+                "total": len(current),
+                "interval": elapsed,
+                "by_cpu": describe(top_cpu, "cpu_percent"),
+                "by_memory": describe(top_rss, "rss"),
+                "by_io": describe(top_io, "io_bytes_per_sec"),
+                "duration": time.monotonic() - start_time
+            }
+        except Exception as error:
+            return {"error": str(error)}
+    
     def get_installed_software(self) -> List[Dict]:
         """Lista software instalado (limitado). Retorna no máximo 20 pacotes Python."""
         software = []
@@ -304,6 +655,7 @@ class DeviceDetector:
             "system": self.get_system_info(),
             "network": self.get_network_info(),
             "hardware": self.get_hardware_info(),
+            "processes": self.get_top_processes(),
             "software": self.get_installed_software(),
             "environment": self.get_environment_info(),
             "network_devices": self.discover_network_devices()
@@ -355,6 +707,13 @@ class DeviceDetector:
             print(f"  Uso CPU: {cpu['cpu_percent']:.1f}%")
             print(f"  Memória: {self._format_bytes(memory['used'])} / {self._format_bytes(memory['total'])} ({memory['percent']:.1f}%)")
         
+        # Processos
+        processes = info["processes"]
+        if "error" not in processes:
+            print(f"\nProcessos ({processes['total']}), maiores consumidores de CPU:")
+            for proc in processes["by_cpu"][:5]:
+                print(f"  {proc['pid']:>7} {proc['name']:<25} {proc['cpu_percent']:5.1f}%")
+        
         # Rede
         network = info["network"]
         print(f"\nRede:")
@@ -2,6 +2,8 @@
 
 class ClientInfoApp {
     constructor() {
+        this.telemetrySource = null;
+        this.telemetryState = {};
         this.init();
     }
 
@@ -17,6 +19,10 @@ class ClientInfoApp {
         document.getElementById('exportReport').addEventListener('click', () => {
             this.exportReport();
         });
+
+        document.getElementById('toggleTelemetry').addEventListener('click', () => {
+            this.toggleTelemetry();
+        });
     }
 
     // Utilitários de UI
@@ -81,6 +87,75 @@ class ClientInfoApp {
         }
     }
 
+    // Telemetria ao vivo (Server-Sent Events)
+    toggleTelemetry() {
+        if (this.telemetrySource) {
+            this.telemetrySource.close();
+            this.telemetrySource = null;
+            this.hide('telemetry');
+            return;
+        }
+
+        this.telemetryState = {};
+        this.show('telemetry');
+        this.telemetrySource = new EventSource('/api/telemetry/stream');
+
+        // Snapshot substitui o estado; delta traz apenas os campos alterados
+        this.telemetrySource.addEventListener('snapshot', (event) => {
+            this.telemetryState = JSON.parse(event.data);
+            this.displayTelemetry();
+        });
+        this.telemetrySource.addEventListener('delta', (event) => {
+            this.mergeTelemetry(this.telemetryState, JSON.parse(event.data));
+            this.displayTelemetry();
+        });
+    }
+
+    mergeTelemetry(target, changes) {
+        Object.entries(changes).forEach(([key, value]) => {
+            // null indica chave removida no servidor
+            if (value === null) {
+                delete target[key];
+            } else if (value && typeof value === 'object' && !Array.isArray(value) &&
+                target[key] && typeof target[key] === 'object') {
+                this.mergeTelemetry(target[key], value);
+            } else {
+                target[key] = value;
+            }
+        });
+    }
+
+    displayTelemetry() {
+        const metrics = this.telemetryState.metrics || {};
+        const connectivity = this.telemetryState.connectivity || {};
+        const formatRate = (value) => value === undefined ? 'N/A' : `${(value / 1024).toFixed(1)} KB/s`;
+
+        const items = [
+            { label: 'CPU', value: `${metrics.cpu_percent ?? 'N/A'}%` },
+            { label: 'Memória', value: `${metrics.memory_percent ?? 'N/A'}%` },
+            { label: 'Load Average', value: Array.isArray(metrics.load_average) ? metrics.load_average.map(v => v.toFixed(2)).join(', ') : 'N/A' },
+            { label: 'Rede (envio)', value: formatRate(metrics.net?.sent_bytes_per_sec) },
+            { label: 'Rede (recebimento)', value: formatRate(metrics.net?.recv_bytes_per_sec) },
+            { label: 'Disco (leitura)', value: formatRate(metrics.disk?.read_bytes_per_sec) },
+            { label: 'Disco (escrita)', value: formatRate(metrics.disk?.write_bytes_per_sec) }
+        ];
+        Object.entries(connectivity).forEach(([target, probe]) => {
+            items.push({ label: `Conectividade ${target}`, value: probe.success ? `${probe.latency_ms} ms` : 'Falha' });
+        });
+
+        const container = this.el('telemetryInfo');
+        container.innerHTML = '';
+        items.forEach(item => {
+            const div = document.createElement('div');
+            div.className = 'info-item';
+            div.innerHTML = `
+                <span class="info-label">${item.label}:</span>
+                <span class="info-value">${item.value}</span>
+            `;
+            container.appendChild(div);
+        });
+    }
+
     getClientInfo() {
         return {
             // Informações do navegador
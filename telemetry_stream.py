@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Transmissão de telemetria ao vivo (Server-Sent Events).
+
+Um único produtor em background coleta métricas do servidor e resultados de
+probes de conectividade e publica cada atualização uma só vez, já codificada
+no formato SSE. Todos os assinantes leem o mesmo evento, então o custo de
+coleta e serialização independe do número de clientes conectados.
+"""
+
+from typing import Dict, Iterator, Optional, Tuple
+import json
+import os
+import socket
+import threading
+import time
+
+import psutil
+
+# Intervalo (s) entre atualizações de métricas
+TELEMETRY_INTERVAL = 1.0
+
+# Probes de conectividade rodam em thread própria a cada N intervalos de métricas
+PROBE_EVERY = 5
+PROBE_TIMEOUT = 2.0
+
+# Alvos dos probes (conexão TCP, não exige privilégios como o ICMP)
+PROBE_TARGETS: Tuple[Tuple[str, int], ...] = (
+    ("8.8.8.8", 53),
+    ("1.1.1.1", 53),
+)
+
+# Comentário SSE enviado periodicamente para manter a conexão aberta
+KEEPALIVE_INTERVAL = 15.0
+
+
+def _format_event(event: str, seq: int, payload: dict) -> bytes:
+    """Codifica um evento SSE."""
+    data = json.dumps(payload, separators=(",", ":"))
+    return f"id: {seq}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _diff(previous: dict, current: dict) -> dict:
+    """Campos de ``current`` que mudaram em relação a ``previous`` (recursivo).
+
+    Chaves removidas são enviadas com valor None (null), que o cliente
+    interpreta como remoção.
+    """
+    changes = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if isinstance(value, dict) and isinstance(old, dict):
+            nested = _diff(old, value)
+            if nested:
+                changes[key] = nested
+        elif value != old or key not in previous:
+            changes[key] = value
+    for key in previous.keys() - current.keys():
+        changes[key] = None
+    return changes
+
+
+def probe_target(host: str, port: int, timeout: float = PROBE_TIMEOUT) -> dict:
+    """Mede o tempo de conexão TCP até ``host:port``."""
+    start_time = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            pass
+        return {"success": True, "latency_ms": round((time.perf_counter() - start_time) * 1000, 2)}
+    except OSError as error:
+        return {"success": False, "error": str(error)}
+
+
+class TelemetryBroadcaster:
+    """Produtor compartilhado de telemetria com distribuição para N assinantes.
+
+    O produtor só roda enquanto houver assinantes. A cada ciclo ele gera o
+    snapshot completo e o delta em relação ao anterior, codifica ambos uma vez
+    e acorda os assinantes. Um assinante novo, ou que perdeu eventos (cliente
+    lento), recebe o snapshot completo em vez de deltas.
+
+    Os probes de conectividade rodam em uma thread separada e o produtor
+    apenas inclui o resultado mais recente, então um alvo inacessível não
+    atrasa o stream de métricas.
+    """
+
+    def __init__(self, interval: float = TELEMETRY_INTERVAL, probe_every: int = PROBE_EVERY):
+        self.interval = interval
+        self.probe_every = probe_every
+        self._condition = threading.Condition()
+        self._subscribers = 0
+        self._thread = None
+        self._reset()
+
+    def _reset(self):
+        """Descarta o estado do produtor (eventos e amostras anteriores)."""
+        self._seq = 0
+        self._probes = {}
+        self._snapshot = {}
+        self._snapshot_event = None
+        self._delta_event = None
+        self._last_net = None
+        self._last_disk = None
+        self._last_time = None
+
+    @property
+    def subscribers(self) -> int:
+        """Número de assinantes conectados."""
+        with self._condition:
+            return self._subscribers
+
+    def subscribe(self) -> Iterator[bytes]:
+        """Gera os eventos SSE para um assinante até a conexão ser encerrada.
+
+        O assinante só é contado (e o produtor iniciado) quando o gerador
+        começa a ser consumido; um gerador fechado sem ser iterado (ex.:
+        requisição HEAD) não mantém o produtor ativo.
+        """
+        return self._stream()
+
+    def _stream(self) -> Iterator[bytes]:
+        """Laço do assinante: espera novos eventos e envia snapshot ou delta."""
+        with self._condition:
+            self._subscribers += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="telemetry-producer", daemon=True)
+                self._thread.start()
+        last_seq = None
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                with self._condition:
+                    if last_seq is None:
+                        # Primeiro evento de dados é sempre o snapshot completo
+                        self._condition.wait_for(lambda: self._snapshot_event is not None,
+                                                 timeout=KEEPALIVE_INTERVAL)
+                    else:
+                        self._condition.wait_for(lambda: self._seq != last_seq, timeout=KEEPALIVE_INTERVAL)
+                    seq = self._seq
+                    if self._snapshot_event is None or seq == last_seq:
+                        chunk = b": keepalive\n\n"
+                    else:
+                        if last_seq is not None and seq == last_seq + 1:
+                            chunk = self._delta_event
+                        else:
+                            chunk = self._snapshot_event
+                        last_seq = seq
+                yield chunk
+        finally:
+            with self._condition:
+                self._subscribers -= 1
+
+    def _run(self):
+        """Laço do produtor; encerra quando não há mais assinantes."""
+        stop = threading.Event()
+        threading.Thread(target=self._run_probes, args=(stop,), name="telemetry-probes", daemon=True).start()
+        while True:
+            with self._condition:
+                if self._subscribers <= 0:
+                    # Sem assinantes: o próximo começa com snapshot e taxas novos
+                    stop.set()
+                    self._reset()
+                    self._thread = None
+                    return
+                probes = self._probes
+
+            snapshot = {"metrics": self._collect_metrics(), "connectivity": probes}
+
+            with self._condition:
+                delta = _diff(self._snapshot, snapshot)
+                self._seq += 1
+                self._snapshot = snapshot
+                self._snapshot_event = _format_event("snapshot", self._seq, snapshot)
+                self._delta_event = _format_event("delta", self._seq, delta)
+                self._condition.notify_all()
+
+            time.sleep(self.interval)
+
+    def _collect_metrics(self) -> dict:
+        """Métricas do servidor; taxas de rede/disco calculadas entre ciclos."""
+        now = time.monotonic()
+        memory = psutil.virtual_memory()
+        metrics = {
+            "timestamp": time.time(),
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": memory.percent,
+            "memory_available": memory.available,
+            "load_average": list(os.getloadavg()) if hasattr(os, "getloadavg") else None,
+        }
+
+        net = psutil.net_io_counters()
+        disk = psutil.disk_io_counters()
+        elapsed = now - self._last_time if self._last_time is not None else None
+        if elapsed and net is not None and self._last_net is not None:
+            metrics["net"] = {
+                "sent_bytes_per_sec": round((net.bytes_sent - self._last_net.bytes_sent) / elapsed, 1),
+                "recv_bytes_per_sec": round((net.bytes_recv - self._last_net.bytes_recv) / elapsed, 1),
+            }
+        if elapsed and disk is not None and self._last_disk is not None:
+            metrics["disk"] = {
+                "read_bytes_per_sec": round((disk.read_bytes - self._last_disk.read_bytes) / elapsed, 1),
+                "write_bytes_per_sec": round((disk.write_bytes - self._last_disk.write_bytes) / elapsed, 1),
+            }
+        self._last_net, self._last_disk, self._last_time = net, disk, now
+        return metrics
+
+    def _run_probes(self, stop: threading.Event):
+        """Laço dos probes; publica o resultado mais recente até ``stop`` ser sinalizado."""
+        while not stop.is_set():
+            probes = self._collect_probes()
+            with self._condition:
+                # Um produtor já encerrado não deve sobrescrever o estado do próximo
+                if stop.is_set():
+                    return
+                self._probes = probes
+            stop.wait(self.interval * self.probe_every)
+
+    def _collect_probes(self) -> Dict[str, dict]:
+        """Executa os probes de conectividade em paralelo."""
+        results = {}
+
+        def run_probe(host: str, port: int):
+            results[f"{host}:{port}"] = probe_target(host, port)
+
+        threads = [threading.Thread(target=run_probe, args=target) for target in PROBE_TARGETS]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+
+_default_broadcaster: Optional[TelemetryBroadcaster] = None
+_default_lock = threading.Lock()
+
+
+def get_broadcaster() -> TelemetryBroadcaster:
+    """Retorna o produtor compartilhado do processo (criado sob demanda)."""
+    global _default_broadcaster
+    with _default_lock:
+        if _default_broadcaster is None:
+            _default_broadcaster = TelemetryBroadcaster()
+        return _default_broadcaster
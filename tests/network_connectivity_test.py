@@ -2,15 +2,17 @@
 """
 Teste de Conectividade de Rede
 Testa conectividade básica, ping, portas e largura de banda
+Suporta execução paralela por interface (hosts com múltiplos links)
 """
 
+import argparse
 import json
 import time
 import socket
 import subprocess
 import threading
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import ping3
 import psutil
 import netifaces
@@ -51,9 +53,90 @@ class NetworkConnectivityTest:
         
         return self.config["network"]["default_subnet"]
     
-    def ping_test(self, target: str) -> Dict:
+    def get_active_interfaces(self, include_no_gateway: bool = False) -> List[Dict]:
+        """Lista as interfaces ativas (link up) com IPv4, exceto loopback, e seus gateways.
+        
+        Interfaces sem gateway IPv4 são ignoradas, a menos que
+        ``include_no_gateway`` seja verdadeiro: sem rota de saída, os probes
+        externos falhariam e o link apareceria como indisponível.
+        """
+        interfaces = []
+        
+        try:
+            link_stats = psutil.net_if_stats()
+            
+            # Mapeia interface -> gateway IPv4 (inclui rotas não padrão)
+            gateways = {}
+            for gateway_ip, name, is_default in netifaces.gateways().get(netifaces.AF_INET, []):
+                if is_default or name not in gateways:
+                    gateways[name] = gateway_ip
+            
+            for name in netifaces.interfaces():
+                stats = link_stats.get(name)
+                if stats is None or not stats.isup:
+                    continue
+                if gateways.get(name) is None and not include_no_gateway:
+                    continue
+                addrs = netifaces.ifaddresses(name).get(netifaces.AF_INET, [])
+                for addr in addrs:
+                    ip = addr.get('addr')
+                    if not ip or ip.startswith('127.'):
+                        continue
+                    network = IPNetwork(f"{ip}/{addr.get('netmask', '255.255.255.255')}")
+                    interfaces.append({
+                        "name": name,
+                        "address": ip,
+                        "network": f"{network.network}/{network.prefixlen}",
+                        "gateway": gateways.get(name)
+                    })
+                    break  # Um endereço por interface é suficiente para os testes
+        except Exception as e:
+            print(f"Erro ao listar interfaces: {e}")
+        
+        return interfaces
+    
+    def _detect_bind_mode(self, interface: Dict) -> str:
+        """Define como os probes serão associados à interface.
+        
+        "device": SO_BINDTODEVICE disponível (Linux, requer CAP_NET_RAW); o
+        tráfego sai obrigatoriamente pela interface.
+        "src_addr": apenas o endereço de origem é fixado. Sem roteamento por
+        política, o kernel ainda pode usar a rota padrão, e os resultados do
+        link podem não refletir a interface testada.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE,
+                            interface["name"].encode() + b"\0")
+            return "device"
+        except (AttributeError, OSError):
+            return "src_addr"
+        finally:
+            sock.close()
+    
+    def _bind_socket(self, sock: socket.socket, interface: Optional[Dict]):
+        """Associa o socket à interface (SO_BINDTODEVICE ou endereço de origem)"""
+        if not interface:
+            return
+        
+        if interface.get("bound") == "device":
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE,
+                            interface["name"].encode() + b"\0")
+        else:
+            sock.bind((interface["address"], 0))
+    
+    def _ping(self, target: str, timeout: float, interface: Optional[Dict] = None):
+        """Executa um ping, opcionalmente pela interface informada"""
+        if not interface:
+            return ping3.ping(target, timeout=timeout)
+        if interface.get("bound") == "device":
+            return ping3.ping(target, timeout=timeout, interface=interface["name"])
+        return ping3.ping(target, timeout=timeout, src_addr=interface["address"])
+    
+    def ping_test(self, target: str, interface: Optional[Dict] = None) -> Dict:
         """Testa conectividade via ping"""
-        print(f"Testando ping para {target}...")
+        via = f" via {interface['name']}" if interface else ""
+        print(f"Testando ping para {target}{via}...")
         
         results = {
             "target": target,
@@ -72,7 +155,7 @@ class NetworkConnectivityTest:
             
             for i in range(packets_sent):
                 start_time = time.time()
-                response = ping3.ping(target, timeout=self.config["network"]["ping_timeout"])
+                response = self._ping(target, self.config["network"]["ping_timeout"], interface)
                 end_time = time.time()
                 
                 if response is not None:
@@ -95,9 +178,10 @@ class NetworkConnectivityTest:
         
         return results
     
-    def port_scan(self, target: str, ports: List[int]) -> Dict:
+    def port_scan(self, target: str, ports: List[int], interface: Optional[Dict] = None) -> Dict:
         """Testa conectividade em portas específicas"""
-        print(f"Testando portas em {target}...")
+        via = f" via {interface['name']}" if interface else ""
+        print(f"Testando portas em {target}{via}...")
         
         results = {
             "target": target,
@@ -110,6 +194,7 @@ class NetworkConnectivityTest:
             try:
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 sock.settimeout(self.config["network"]["scan_timeout"])
+                self._bind_socket(sock, interface)
                 result = sock.connect_ex((target, port))
                 sock.close()
                 
@@ -132,9 +217,10 @@ class NetworkConnectivityTest:
         
         return results
     
-    def bandwidth_test(self, target: str) -> Dict:
+    def bandwidth_test(self, target: str, interface: Optional[Dict] = None) -> Dict:
         """Testa largura de banda (simulado)"""
-        print(f"Testando largura de banda para {target}...")
+        via = f" via {interface['name']}" if interface else ""
+        print(f"Testando largura de banda para {target}{via}...")
         
         results = {
             "target": target,
@@ -150,7 +236,7 @@ class NetworkConnectivityTest:
             start_time = time.time()
             
             # Teste de latência
-            response = ping3.ping(target, timeout=5)
+            response = self._ping(target, 5, interface)
             if response is not None:
                 results["latency"] = response * 1000  # ms
             
@@ -203,6 +289,79 @@ class NetworkConnectivityTest:
         
         return self.results
     
+    def run_interface_test(self, interface: Dict) -> Dict:
+        """Executa a bateria de testes (ping/portas/banda) por uma interface"""
+        interface = dict(interface, bound=self._detect_bind_mode(interface))
+        if interface["bound"] == "src_addr":
+            print(f"Aviso: SO_BINDTODEVICE indisponível para {interface['name']} "
+                  f"(requer CAP_NET_RAW); usando apenas o endereço de origem")
+        
+        results = {
+            "interface": interface["name"],
+            "address": interface["address"],
+            "network": interface["network"],
+            "gateway": interface["gateway"],
+            "bound": interface["bound"],
+            "tests": {}
+        }
+        start_time = time.time()
+        
+        gateway_ip = interface["gateway"]
+        if gateway_ip:
+            results["tests"]["gateway_ping"] = self.ping_test(gateway_ip, interface)
+        
+        results["tests"]["dns_ping"] = self.ping_test("8.8.8.8", interface)
+        
+        if gateway_ip:
+            results["tests"]["gateway_ports"] = self.port_scan(
+                gateway_ip, self.config["network"]["common_ports"], interface)
+        
+        if self.config["connectivity_tests"]["bandwidth_test"]["enabled"]:
+            results["tests"]["bandwidth"] = self.bandwidth_test(gateway_ip or "8.8.8.8", interface)
+        
+        results["duration"] = time.time() - start_time
+        return results
+    
+    def run_per_interface_test(self, include_no_gateway: bool = False) -> Dict:
+        """Executa os testes em todas as interfaces ativas em paralelo"""
+        print("Iniciando testes de conectividade por interface...")
+        
+        interfaces = self.get_active_interfaces(include_no_gateway)
+        print(f"Interfaces detectadas: {', '.join(i['name'] for i in interfaces) or 'nenhuma'}")
+        
+        per_interface = {}
+        
+        def test_interface(interface: Dict):
+            try:
+                per_interface[interface["name"]] = self.run_interface_test(interface)
+            except Exception as e:
+                per_interface[interface["name"]] = {"interface": interface["name"], "error": str(e)}
+        
+        # Cada link é testado em sua própria thread: N links levam o tempo de um
+        start_time = time.time()
+        threads = []
+        for interface in interfaces:
+            thread = threading.Thread(target=test_interface, args=(interface,))
+            threads.append(thread)
+            thread.start()
+        
+        for thread in threads:
+            thread.join()
+        
+        self.results["tests"]["interfaces"] = [
+            per_interface[i["name"]] for i in interfaces if i["name"] in per_interface
+        ]
+        self.results["tests"]["interfaces_duration"] = time.time() - start_time
+        
+        self.results["system_info"] = {
+            "hostname": socket.gethostname(),
+            "interfaces": list(netifaces.interfaces()),
+            "cpu_percent": psutil.cpu_percent(),
+            "memory_percent": psutil.virtual_memory().percent
+        }
+        
+        return self.results
+    
     def save_results(self, filename: str = None):
         """Salva os resultados em arquivo"""
         if not filename:
@@ -215,11 +374,62 @@ class NetworkConnectivityTest:
         print(f"Resultados salvos em: {filename}")
 
 
+def print_interface_comparison(results: Dict):
+    """Imprime a comparação lado a lado dos links testados"""
+    interfaces = results["tests"].get("interfaces", [])
+    print("\n=== Comparação entre Interfaces ===")
+    if not interfaces:
+        print("Nenhuma interface ativa encontrada")
+        return
+    
+    def fmt_ping(ping: Optional[Dict]) -> str:
+        if not ping:
+            return "-"
+        if not ping["success"]:
+            return "✗"
+        return f"{ping['avg_response_time']:.1f}ms/{ping['packet_loss']:.0f}%"
+    
+    header = (f"{'Interface':<12} {'Endereço':<16} {'Gateway':<16} {'Ping GW':>14} "
+              f"{'Ping DNS':>14} {'Portas':>7} {'Vínculo':>9}")
+    print(header)
+    print("-" * len(header))
+    for link in interfaces:
+        if "error" in link:
+            print(f"{link['interface']:<12} erro: {link['error']}")
+            continue
+        tests = link["tests"]
+        ports = tests.get("gateway_ports")
+        open_ports = str(len(ports["open_ports"])) if ports else "-"
+        print(f"{link['interface']:<12} {link['address']:<16} {link['gateway'] or '-':<16} "
+              f"{fmt_ping(tests.get('gateway_ping')):>14} {fmt_ping(tests.get('dns_ping')):>14} "
+              f"{open_ports:>7} {link['bound']:>9}")
+    print(f"Tempo total: {results['tests']['interfaces_duration']:.1f}s")
+    if any(link.get("bound") == "src_addr" for link in interfaces):
+        print("Aviso: links com vínculo 'src_addr' podem ter saído pela rota padrão; "
+              "execute com CAP_NET_RAW (ou root) para resultados precisos por interface")
+
+
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Teste de conectividade de rede")
+    parser.add_argument("--config", "-c", default="config/test_config.json", help="Arquivo de configuração")
+    parser.add_argument("--per-interface", "-i", action="store_true",
+                        help="Testa cada interface ativa em paralelo e compara os links")
+    parser.add_argument("--include-no-gateway", action="store_true",
+                        help="Com --per-interface, inclui interfaces sem gateway IPv4")
+    
+    args = parser.parse_args()
+    
     print("=== Teste de Conectividade de Rede ===")
     
-    tester = NetworkConnectivityTest()
+    tester = NetworkConnectivityTest(args.config)
+    
+    if args.per_interface:
+        results = tester.run_per_interface_test(args.include_no_gateway)
+        print_interface_comparison(results)
+        tester.save_results()
+        return
+    
     results = tester.run_comprehensive_test()
     
     # Exibe resumo dos resultados
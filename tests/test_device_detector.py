@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Testes do DeviceDetector (coleta de disco e perfilador de processos)
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import device_detector  # noqa: E402
+from device_detector import DeviceDetector, MountInfoCache  # noqa: E402
+
+Usage = namedtuple("Usage", "total used free percent")
+
+MOUNTINFO = "\n".join([
+    "22 1 254:0 / / rw,relatime - ext4 /dev/vda rw",
+    "23 22 0:5 / /proc rw - proc proc rw",
+    "24 22 0:24 / /dev/shm rw - tmpfs shm rw",
+    "25 22 0:27 / /dev/shm rw - tmpfs tmpfs rw",
+    "26 22 254:0 /data /srv/data rw - ext4 /dev/vda rw",
+    "27 22 254:16 / /mnt/my\\040disk rw shared:1 - ext4 /dev/vdb rw",
+    "28 22 7:0 / /snap/core/1 ro - squashfs /dev/loop0 ro",
+])
+
+
+class FakeMountCache:
+    def __init__(self, mounts):
+        self.mounts = mounts
+
+    def get_mounts(self):
+        return list(self.mounts)
+
+
+def make_detector(mounts):
+    detector = DeviceDetector()
+    detector.mount_cache = FakeMountCache(mounts)
+    return detector
+
+
+def test_parse_mountinfo_keeps_visible_mount_per_mountpoint():
+    mounts = MountInfoCache._parse_mountinfo(MOUNTINFO)
+    by_mountpoint = {mount["mountpoint"]: mount for mount in mounts}
+
+    assert [mount["mountpoint"] for mount in mounts].count("/dev/shm") == 1
+    assert by_mountpoint["/dev/shm"]["device_id"] == "0:27"
+
+
+def test_parse_mountinfo_skips_pseudo_and_bind_duplicates():
+    mounts = MountInfoCache._parse_mountinfo(MOUNTINFO)
+    mountpoints = [mount["mountpoint"] for mount in mounts]
+
+    assert "/proc" not in mountpoints
+    assert "/srv/data" not in mountpoints  # bind mount de 254:0
+    assert "/mnt/my disk" in mountpoints
+    assert "/snap/core/1" in mountpoints
+
+
+def test_get_disk_info_with_duplicate_mountpoints(monkeypatch):
+    monkeypatch.setattr(device_detector.psutil, "disk_usage", lambda path: Usage(100, 25, 75, 25.0))
+    detector = make_detector([
+        {"device": "shm", "mountpoint": "/dev/shm", "fstype": "tmpfs"},
+        {"device": "tmpfs", "mountpoint": "/dev/shm", "fstype": "tmpfs"},
+        {"device": "/dev/vda", "mountpoint": "/", "fstype": "ext4"},
+    ])
+
+    start_time = time.monotonic()
+    disks = detector.get_disk_info(timeout=1.0)
+
+    assert time.monotonic() - start_time < 1.0
+    assert len(disks) == 3
+    assert all(disk["percent"] == 25.0 for disk in disks)
+
+
+def test_get_disk_info_times_out_hung_mount_and_retries_after_release(monkeypatch):
+    release = threading.Event()
+
+    def disk_usage(path):
+        if path == "/mnt/nfs":
+            release.wait()
+        return Usage(100, 50, 50, 50.0)
+
+    monkeypatch.setattr(device_detector.psutil, "disk_usage", disk_usage)
+    detector = make_detector([
+        {"device": "/dev/vda", "mountpoint": "/", "fstype": "ext4"},
+        {"device": "server:/export", "mountpoint": "/mnt/nfs", "fstype": "nfs"},
+    ])
+
+    disks = {disk["mountpoint"]: disk for disk in detector.get_disk_info(timeout=0.2)}
+    assert disks["/"]["total"] == 100
+    assert "timeout" in disks["/mnt/nfs"]["error"]
+
+    disks = {disk["mountpoint"]: disk for disk in detector.get_disk_info(timeout=0.2)}
+    assert "ignorada" in disks["/mnt/nfs"]["error"]
+
+    release.set()
+    time.sleep(0.05)
+    disks = {disk["mountpoint"]: disk for disk in detector.get_disk_info(timeout=0.2)}
+    assert disks["/mnt/nfs"]["total"] == 100
+
+
+CpuTimes = namedtuple("CpuTimes", "user system")
+IoCounters = namedtuple("IoCounters", "read_bytes write_bytes")
+MemoryInfo = namedtuple("MemoryInfo", "rss")
+
+
+class FakeProcess:
+    __slots__ = ("pid", "info")
+
+    def __init__(self, pid, info):
+        self.pid = pid
+        self.info = info
+
+
+def fake_processes(count, step):
+    """Processos sintéticos: CPU, RSS e I/O crescem com o pid"""
+    return [FakeProcess(pid, {
+        "create_time": 1.0,
+        "cpu_times": CpuTimes(pid * step * 1e-6, 0.0),
+        "memory_info": MemoryInfo(pid * 1024),
+        "io_counters": IoCounters(pid * step, 0),
+    }) for pid in range(1, count + 1)]
+
+
+def patch_processes(monkeypatch, snapshots):
+    def process_iter(attrs=None, ad_value=None):
+        return iter(snapshots.pop(0))
+
+    def no_such_process(pid):
+        raise device_detector.psutil.NoSuchProcess(pid)
+
+    monkeypatch.setattr(device_detector.psutil, "process_iter", process_iter)
+    monkeypatch.setattr(device_detector.psutil, "Process", no_such_process)
+
+
+def test_top_processes_enforces_minimum_window(monkeypatch):
+    patch_processes(monkeypatch, [fake_processes(10, 1), fake_processes(10, 2), fake_processes(10, 3)])
+    detector = DeviceDetector()
+
+    first = detector.get_top_processes(top_n=3, interval=0.2)
+    second = detector.get_top_processes(top_n=3, interval=0.2)
+
+    assert first["interval"] >= 0.2
+    assert second["interval"] >= 0.2
+    assert [entry["pid"] for entry in second["by_cpu"]] == [10, 9, 8]
+
+
+def test_top_processes_50k_is_fast_and_bounded(monkeypatch):
+    count = 50000
+    patch_processes(monkeypatch, [fake_processes(count, 1), fake_processes(count, 2)])
+    detector = DeviceDetector()
+    detector.get_top_processes(top_n=10, interval=0.0)
+
+    start_time = time.monotonic()
+    result = detector.get_top_processes(top_n=10, interval=0.0)
+    elapsed = time.monotonic() - start_time
+
+    assert result["total"] == count
+    assert elapsed < 1.0
+    for key in ("by_cpu", "by_memory", "by_io"):
+        assert len(result[key]) == 10
+        assert result[key][0]["pid"] == count
+    # Estado mantido entre chamadas: apenas uma tupla compacta por processo
+    assert len(detector._last_process_sample[1]) == count
+    assert all(len(entry) == 3 for entry in detector._last_process_sample[1].values())
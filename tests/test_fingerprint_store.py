@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Testes do armazenamento deduplicado de fingerprints
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerprint_store import FingerprintStore  # noqa: E402
+
+PLUGINS = [{"name": f"PDF Viewer {i}", "filename": "internal-pdf-viewer",
+            "description": "Portable Document Format"} for i in range(5)]
+
+
+def submission(**browser):
+    return {"browser": dict({"userAgent": "Mozilla/5.0", "plugins": PLUGINS}, **browser),
+            "additional": {"cookies": "a=1", "webGL": {"available": True}}}
+
+
+def test_round_trip_shares_blocks():
+    store = FingerprintStore()
+    first = submission()
+    refs = store.add("a", first)
+    store.add("b", submission())
+
+    assert "browser.plugins" in refs
+    assert store.get("a") == first
+    assert store.stats()["unique_blocks"] == 1
+    assert store.stats()["block_references"] == 2
+
+
+def test_client_supplied_ref_is_plain_data():
+    store = FingerprintStore()
+    digest = store.add("a", submission())["browser.plugins"]
+
+    bogus = {"browser": {"plugins": {"$ref": "x"}}}
+    store.add("b", bogus)
+    assert store.get("b") == bogus
+
+    # Um digest existente enviado pelo cliente não expõe o bloco armazenado
+    forged = {"browser": {"plugins": {"$ref": digest}}}
+    store.add("c", forged)
+    assert store.get("c") == forged
+
+
+def test_non_object_payloads_are_stored_without_dedup():
+    store = FingerprintStore()
+    assert store.add("list", [1, 2]) == {}
+    assert store.get("list") == [1, 2]
+    assert store.add("text", "abc") == {}
+    assert store.get("text") == "abc"
+
+
+def test_oversized_submission_is_rejected():
+    store = FingerprintStore(max_submission_bytes=1024)
+    assert store.add("big", {"additional": {"blob": "x" * 4096}}) is None
+    assert store.get("big") is None
+    assert store.stats()["block_bytes"] == 0
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Testes do produtor compartilhado de telemetria (SSE)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import telemetry_stream  # noqa: E402
+from telemetry_stream import TelemetryBroadcaster, _diff  # noqa: E402
+
+
+def data_events(stream, count):
+    """Lê ``count`` eventos de dados (ignora retry/keepalive)"""
+    events = []
+    for chunk in stream:
+        if chunk.startswith(b"id:"):
+            events.append(chunk.split(b"\n")[1].decode())
+            if len(events) == count:
+                return events
+    return events
+
+
+def wait_stopped(broadcaster, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while broadcaster._thread is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_new_subscriber_starts_with_snapshot(monkeypatch):
+    monkeypatch.setattr(telemetry_stream, "probe_target", lambda host, port: {"success": True})
+    broadcaster = TelemetryBroadcaster(interval=0.02)
+    stream = broadcaster.subscribe()
+
+    assert data_events(stream, 3) == ["event: snapshot", "event: delta", "event: delta"]
+
+    late = broadcaster.subscribe()
+    assert data_events(late, 1) == ["event: snapshot"]
+    stream.close()
+    late.close()
+
+
+def test_slow_probe_does_not_stall_metrics(monkeypatch):
+    def slow_probe(host, port):
+        time.sleep(1.0)
+        return {"success": False, "error": "timeout"}
+
+    monkeypatch.setattr(telemetry_stream, "probe_target", slow_probe)
+    broadcaster = TelemetryBroadcaster(interval=0.02, probe_every=1)
+    stream = broadcaster.subscribe()
+
+    start_time = time.monotonic()
+    assert len(data_events(stream, 10)) == 10
+    assert time.monotonic() - start_time < 0.8
+    stream.close()
+
+
+def test_unstarted_stream_does_not_keep_producer(monkeypatch):
+    monkeypatch.setattr(telemetry_stream, "probe_target", lambda host, port: {"success": True})
+    broadcaster = TelemetryBroadcaster(interval=0.02)
+
+    broadcaster.subscribe().close()
+    assert broadcaster.subscribers == 0
+    assert broadcaster._thread is None
+
+    stream = broadcaster.subscribe()
+    data_events(stream, 2)
+    stream.close()
+    wait_stopped(broadcaster)
+    assert broadcaster.subscribers == 0
+    assert broadcaster._thread is None
+    assert broadcaster._seq == 0 and broadcaster._snapshot == {}
+
+
+def test_diff_marks_removed_keys_as_null():
+    previous = {"probe": {"success": False, "error": "timeout"}, "net": {"sent": 1}}
+    current = {"probe": {"success": True, "latency_ms": 2.0}}
+
+    assert _diff(previous, current) == {
+        "probe": {"success": True, "latency_ms": 2.0, "error": None},
+        "net": None,
+    }